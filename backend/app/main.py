@@ -13,7 +13,7 @@ from app.core.config import settings
 from app.db.mongo import db_manager
 from app.api.v1.endpoints import files, health
 from app.core.middleware import RequestLogMiddleware
-from app.services.cleanup import delete_expired_files
+from app.services.cleanup import delete_expired_files, ensure_retention_index
 from app.core.logging import setup_logging
 
 # Initialize Scheduler
@@ -36,13 +36,21 @@ async def lifespan(_app: FastAPI):
     db_manager.connect()
 
     # 3. Startup: Configure and Start Scheduler
-    # Run cleanup check every 60 minutes
+    # Sweep expired uploads (metadata and GridFS content) every 60 minutes
     scheduler.add_job(
         delete_expired_files,
         trigger=IntervalTrigger(minutes=60),
         id="lgpd_cleanup_job",
         replace_existing=True,
     )
+    # TTL index on 'created_at', so MongoDB also expires metadata between sweeps.
+    # Created by a one-off job so startup does not wait on the database being
+    # reachable; every cleanup sweep ensures it again should this attempt fail.
+    scheduler.add_job(
+        ensure_retention_index,
+        id="lgpd_retention_index",
+        replace_existing=True,
+    )
     scheduler.start()
 
     yield
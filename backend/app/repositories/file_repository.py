@@ -4,7 +4,7 @@ Encapsulates MongoDB/GridFS access.
 """
 
 from datetime import datetime, timezone
-from typing import Optional, List, Union
+from typing import Optional, List, Set, Union
 
 from bson import ObjectId
 
@@ -141,3 +141,50 @@ async def delete_file(file_id: str) -> bool:
     if processed_fs_id:
         await db_manager.fs_bucket.delete(_ensure_object_id(processed_fs_id))
     return True
+
+
+async def ensure_created_at_ttl_index(expire_after_seconds: int) -> None:
+    """Creates (idempotently) the TTL index expiring metadata by 'created_at'."""
+    await db_manager.db.files.create_index(
+        [("created_at", 1)], expireAfterSeconds=expire_after_seconds
+    )
+
+
+def find_files_created_before(cutoff: datetime):
+    """Returns a cursor over metadata created before 'cutoff' (GridFS ids only)."""
+    return db_manager.db.files.find(
+        {"created_at": {"$lt": cutoff}}, {"raw_fs_id": 1, "processed_fs_id": 1}
+    )
+
+
+async def delete_files_metadata(file_ids: List[ObjectId]) -> int:
+    """Deletes the given metadata documents; returns how many were removed."""
+    result = await db_manager.db.files.delete_many({"_id": {"$in": file_ids}})
+    return result.deleted_count
+
+
+async def find_referenced_fs_ids(fs_ids: List[ObjectId]) -> Set[ObjectId]:
+    """Returns the subset of 'fs_ids' still referenced by a metadata document."""
+    cursor = db_manager.db.files.find(
+        {
+            "$or": [
+                {"raw_fs_id": {"$in": fs_ids}},
+                {"processed_fs_id": {"$in": fs_ids}},
+            ]
+        },
+        {"raw_fs_id": 1, "processed_fs_id": 1},
+    )
+    referenced = set()
+    async for doc in cursor:
+        referenced.update((doc.get("raw_fs_id"), doc.get("processed_fs_id")))
+    return referenced & set(fs_ids)
+
+
+def find_grid_files_uploaded_before(cutoff: datetime):
+    """Returns a cursor over GridFS files whose 'uploadDate' precedes 'cutoff'."""
+    return db_manager.fs_bucket.find({"uploadDate": {"$lt": cutoff}})
+
+
+async def delete_grid_file(fs_id: Union[str, ObjectId]) -> None:
+    """Deletes a GridFS file and its chunks."""
+    await db_manager.fs_bucket.delete(_ensure_object_id(fs_id))
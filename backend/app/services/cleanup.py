@@ -2,53 +2,133 @@
 Background cleanup service for expired files.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from app.db.mongo import db_manager
 from app.repositories import file_repository
 
 logger = logging.getLogger(__name__)
 
 # Configuration: Files older than 24 hours are deleted
 RETENTION_PERIOD_HOURS = 24
+RETENTION_PERIOD_SECONDS = RETENTION_PERIOD_HOURS * 60 * 60
+
+# GridFS content is written before the metadata that references it, so content
+# no document points at yet may belong to an upload still being processed.
+ORPHAN_GRACE_MINUTES = 15
+
+# Upper bound on GridFS deletes in flight (and items buffered) during one sweep
+MAX_CONCURRENT_DELETES = 16
+
+
+async def ensure_retention_index():
+    """
+    Creates the TTL index on 'files.created_at', so MongoDB expires metadata
+    documents itself once they exceed the retention period.
+    """
+    try:
+        await file_repository.ensure_created_at_ttl_index(RETENTION_PERIOD_SECONDS)
+    except Exception as err:  # pylint: disable=broad-except
+        logger.error("Failed to create retention TTL index: %s", err)
+
+
+async def _batched(cursor):
+    """Groups the items of an async cursor into lists of MAX_CONCURRENT_DELETES."""
+    batch = []
+    async for item in cursor:
+        batch.append(item)
+        if len(batch) == MAX_CONCURRENT_DELETES:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+async def _delete_grid_file(fs_id) -> bool:
+    try:
+        await file_repository.delete_grid_file(fs_id)
+        return True
+    except Exception as err:  # pylint: disable=broad-except
+        logger.error("Failed to auto-delete GridFS file %s: %s", fs_id, err)
+        return False
+
+
+async def _delete_file_content(doc) -> int:
+    """Deletes the raw and processed GridFS content of one metadata document."""
+    fs_ids = (doc.get("raw_fs_id", doc["_id"]), doc.get("processed_fs_id"))
+    deleted = 0
+    for fs_id in fs_ids:
+        if fs_id and await _delete_grid_file(fs_id):
+            deleted += 1
+    return deleted
+
+
+async def _delete_expired_uploads(cutoff_time) -> int:
+    """
+    Deletes every upload whose metadata is older than 'cutoff_time': first the
+    GridFS content it references, however recent, then the documents.
+    Returns the number of GridFS files deleted.
+    """
+    deleted_count = 0
+    async for docs in _batched(file_repository.find_files_created_before(cutoff_time)):
+        deleted_count += sum(await asyncio.gather(*map(_delete_file_content, docs)))
+        # Content that failed to delete is left to the orphan sweep
+        removed = await file_repository.delete_files_metadata(
+            [doc["_id"] for doc in docs]
+        )
+        logger.info("Removed %d expired metadata documents.", removed)
+    return deleted_count
+
+
+async def _delete_orphaned_content(cutoff_time) -> int:
+    """
+    Deletes GridFS content uploaded before 'cutoff_time' that no metadata
+    document references, e.g. uploads whose metadata the TTL index expired.
+    Returns the number of GridFS files deleted.
+    """
+    deleted_count = 0
+    cursor = file_repository.find_grid_files_uploaded_before(cutoff_time)
+    async for grid_outs in _batched(cursor):
+        # pylint: disable=protected-access
+        fs_ids = [grid_out._id for grid_out in grid_outs]
+        referenced = await file_repository.find_referenced_fs_ids(fs_ids)
+        orphans = [fs_id for fs_id in fs_ids if fs_id not in referenced]
+        deleted_count += sum(await asyncio.gather(*map(_delete_grid_file, orphans)))
+    return deleted_count
 
 
 async def delete_expired_files():
     """
-    Background Task: Finds and removes files exceeding the retention period.
+    Background Task: Removes uploads exceeding the retention period.
+    Deletes each expired metadata document together with its raw and processed
+    GridFS content, then any content left without metadata. The TTL index on
+    'created_at' is (re)ensured on every sweep as well, but the sweep does not
+    depend on it.
     Ensures LGPD Data Minimization compliance by permanently removing old data.
     """
     try:
+        # Idempotent; retries every sweep if the startup attempt failed
+        await ensure_retention_index()
+
         # Calculate the cutoff time (Now - 24h)
-        cutoff_time = datetime.now(timezone.utc) - timedelta(
-            hours=RETENTION_PERIOD_HOURS
-        )
+        now = datetime.now(timezone.utc)
+        cutoff_time = now - timedelta(hours=RETENTION_PERIOD_HOURS)
 
         logger.info(
             "Running scheduled cleanup. Looking for files created before %s",
             cutoff_time,
         )
 
-        # Find files where 'created_at' is less than (older than) cutoff_time
-        cursor = db_manager.db.files.find({"created_at": {"$lt": cutoff_time}})
-
-        deleted_count = 0
-        async for doc in cursor:
-            file_id = str(doc["_id"])
-            try:
-                # Reuse our robust delete logic (which handles GridFS + Metadata)
-                await file_repository.delete_file(file_id)
-                deleted_count += 1
-                logger.info("Auto-deleted expired file: %s", file_id)
-            # pylint: disable=broad-except
-            except Exception as err:
-                logger.error("Failed to auto-delete file %s: %s", file_id, err)
+        deleted_count = await _delete_expired_uploads(cutoff_time)
+        deleted_count += await _delete_orphaned_content(
+            now - timedelta(minutes=ORPHAN_GRACE_MINUTES)
+        )
 
         if deleted_count > 0:
             logger.info("Cleanup complete. Removed %d expired files.", deleted_count)
         else:
             logger.info("Cleanup complete. No expired files found.")
 
-    # pylint: disable=broad-except
-    except Exception as err:
+    except Exception as err:  # pylint: disable=broad-except
         logger.error("Error during scheduled cleanup: %s", err)
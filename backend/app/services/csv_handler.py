@@ -7,7 +7,6 @@ import csv
 import logging
 from io import StringIO
 from typing import List, Tuple, Dict, Optional
-from collections import OrderedDict
 
 from fastapi.concurrency import run_in_threadpool
 from app.utils.sanitize import sanitize_cell_value
@@ -63,6 +62,28 @@ def _is_vertical_layout(content: str, dialect: csv.Dialect) -> bool:
     return duplication_ratio > 0.3
 
 
+def _add_record(
+    record: Dict, id_field: str, grouped: Dict[str, Dict], ordered_records: List[Dict]
+) -> None:
+    """
+    Appends a record, or merges it into the earlier record sharing its id.
+    """
+    record_id = record.get(id_field) if id_field else None
+    if not record_id:
+        ordered_records.append(record)
+        return
+
+    merged = grouped.get(record_id)
+    if merged is None:
+        grouped[record_id] = record
+        ordered_records.append(record)
+        return
+
+    for field, value in record.items():
+        if field != id_field and value not in ("", None):
+            merged[field] = value
+
+
 def _group_records_by_id(records: List[Dict], id_field: Optional[str]) -> List[Dict]:
     """
     Groups records by an id field, merging rows that share the same identifier.
@@ -74,41 +95,56 @@ def _group_records_by_id(records: List[Dict], id_field: Optional[str]) -> List[D
     if not clean_id_field:
         return records
 
-    grouped: "OrderedDict[str, OrderedDict]" = OrderedDict()
-    ordered_records: List[OrderedDict] = []
+    # Records are copied so merging never mutates the caller's dicts; rows
+    # without an id stay where they appeared instead of moving to the end.
+    grouped: Dict[str, Dict] = {}
+    ordered_records: List[Dict] = []
 
     for record in records:
-        record_id = record.get(clean_id_field)
-        if not record_id:
-            ordered_records.append(OrderedDict(record))
-            continue
-
-        if record_id not in grouped:
-            grouped[record_id] = OrderedDict(record)
-            ordered_records.append(grouped[record_id])
-            continue
-
-        for field, value in record.items():
-            if field == clean_id_field:
-                continue
-            if value not in ("", None):
-                grouped[record_id][field] = value
+        _add_record(dict(record), clean_id_field, grouped, ordered_records)
+
+    return ordered_records
 
-    return [dict(record) for record in ordered_records]
 
+def _parse_horizontal(
+    content: str, dialect: csv.Dialect, id_field: str
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Parses a standard header-plus-rows CSV, sanitizing each cell and grouping
+    rows by the (already stripped) id field as they are read.
+    """
+    records: List[Dict] = []
+    ordered_fields: List[str] = []
+    grouped: Dict[str, Dict] = {}
+
+    try:
+        reader = csv.reader(StringIO(content), dialect=dialect)
+        header = next(reader, None) or []
+
+        # Resolve the header once instead of re-keying a dict per row; blank
+        # column names are dropped and extra cells beyond the header ignored.
+        columns = [
+            (index, field.strip()) for index, field in enumerate(header) if field
+        ]
+        ordered_fields = [name for _, name in columns]
+        # Copying a pre-keyed dict reuses its sized hash table for every row
+        template = dict.fromkeys(ordered_fields, "")
 
-def _sanitize_row(row: Dict) -> Optional[OrderedDict]:
-    sanitized_row = OrderedDict()
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < len(header):
+                row += [""] * (len(header) - len(row))
+            record = template.copy()
+            for index, name in columns:
+                record[name] = sanitize_cell_value(row[index])
+            if record:
+                _add_record(record, id_field, grouped, records)
 
-    for field, value in row.items():
-        if field:
-            clean_field = field.strip()
-            raw_value = value if value is not None else ""
-            sanitized_row[clean_field] = sanitize_cell_value(raw_value)
+    except csv.Error as error:
+        logger.error("CSV Parsing Error: %s", error)
 
-    if sanitized_row:
-        return sanitized_row
-    return None
+    return records, ordered_fields
 
 
 def _parse_csv_sync(
@@ -117,7 +153,8 @@ def _parse_csv_sync(
     """
     Synchronous logic to parse, sanitize, and extract schema from CSV content.
     """
-    if not content:
+    # Blank uploads have nothing to detect or parse
+    if not content or content.isspace():
         return [], []
 
     dialect = _detect_dialect(content)
@@ -128,24 +165,7 @@ def _parse_csv_sync(
         records, fields = parse_vertical_csv(content, dialect)
         return _group_records_by_id(records, id_field), fields
 
-    records: List[Dict] = []
-    ordered_fields: List[str] = []
-
-    try:
-        reader = csv.DictReader(StringIO(content), dialect=dialect)
-
-        if reader.fieldnames:
-            ordered_fields = [f.strip() for f in reader.fieldnames if f]
-
-        for row in reader:
-            sanitized_row = _sanitize_row(row)
-            if sanitized_row:
-                records.append(sanitized_row)
-
-    except csv.Error as error:
-        logger.error("CSV Parsing Error: %s", error)
-
-    return _group_records_by_id(records, id_field), ordered_fields
+    return _parse_horizontal(content, dialect, id_field.strip() if id_field else "")
 
 
 async def process_csv_content(
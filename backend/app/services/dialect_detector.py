@@ -6,7 +6,8 @@ import csv
 import re
 from collections import Counter
 from io import StringIO
-from typing import List, Tuple, Pattern
+from itertools import product
+from typing import Iterator, List, Pattern, Set, Tuple
 
 
 class DialectDetector:
@@ -35,6 +36,18 @@ class DialectDetector:
         re.compile(r"^[A-Za-z0-9\s\-_]+$"),  # Alphanumeric
     ]
 
+    # All of the above as one alternation: a cell is typed if any pattern matches,
+    # so a single C-level match replaces up to nine Python-level calls per cell.
+    KNOWN_TYPE_PATTERN: Pattern = re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern in TYPE_PATTERNS)
+    )
+
+    # Candidate dialect characters (Theta_x)
+    DELIMITERS: Tuple[str, ...] = (",", ";", "\t", "|")
+    QUOTECHARS: Tuple[str, ...] = ('"', "'")
+    # The candidate set never depends on the content, so it is built once
+    CANDIDATES: Tuple[Tuple[str, str], ...] = tuple(product(DELIMITERS, QUOTECHARS))
+
     def __init__(self, sample_size: int = 8192):
         self.sample_size = sample_size
 
@@ -44,12 +57,17 @@ class DialectDetector:
         Q = Pattern_Score * Type_Score
         """
         sample = content[: self.sample_size]
-        candidates = self._get_potential_dialects()
+
+        # Without any candidate delimiter or quote character every candidate
+        # parses the sample identically, so scoring would just pick the default.
+        present = {char for char in self.DELIMITERS + self.QUOTECHARS if char in sample}
+        if not present:
+            return csv.get_dialect("excel")
 
         best_dialect = None
         best_score = -1.0
 
-        for delimiter, quotechar in candidates:
+        for delimiter, quotechar in self._distinct_candidates(present):
             # pylint: disable=broad-except
             try:
                 rows = self._parse_sample(sample, delimiter, quotechar)
@@ -84,18 +102,29 @@ class DialectDetector:
 
         return csv.get_dialect(dialect_name)
 
-    def _get_potential_dialects(self) -> List[Tuple[str, str]]:
+    def _distinct_candidates(self, present: Set[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Yields the candidates that can parse the sample differently.
+        A character missing from the sample never splits or quotes a field, so
+        candidates differing only in absent characters parse the same rows; the
+        first of them wins any tie, so the rest are skipped.
+        """
+        seen = set()
+        for delimiter, quotechar in self._get_potential_dialects():
+            parse_key = (
+                delimiter if delimiter in present else None,
+                quotechar if quotechar in present else None,
+            )
+            if parse_key not in seen:
+                seen.add(parse_key)
+                yield delimiter, quotechar
+
+    def _get_potential_dialects(self) -> Tuple[Tuple[str, str], ...]:
         """
         Construct potential dialects (Theta_x).
         The paper suggests filtering this list, but use a fixed common set for efficiency.
         """
-        delimiters = [",", ";", "\t", "|"]
-        quotechars = ['"', "'"]
-        candidates = []
-        for delimiter in delimiters:
-            for quotechar in quotechars:
-                candidates.append((delimiter, quotechar))
-        return candidates
+        return self.CANDIDATES
 
     def _parse_sample(
         self, sample: str, delimiter: str, quotechar: str
@@ -145,13 +174,11 @@ class DialectDetector:
         if total_cells == 0:
             return self.BETA
 
-        matched_cells = 0
-        for row in rows:
-            for cell in row:
-                cell_val = cell.strip()
-                # Check against known types
-                if any(regex.match(cell_val) for regex in self.TYPE_PATTERNS):
-                    matched_cells += 1
+        # Check against known types
+        is_known_type = self.KNOWN_TYPE_PATTERN.match
+        matched_cells = sum(
+            1 for row in rows for cell in row if is_known_type(cell.strip())
+        )
 
         score = matched_cells / total_cells
         # Use Beta to avoid zeroing out valid pattern scores
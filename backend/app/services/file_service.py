@@ -4,7 +4,7 @@ Orchestrates storage and CSV processing.
 """
 
 import csv
-from io import StringIO
+from io import BytesIO, TextIOWrapper
 from typing import Optional, List, Dict, Tuple
 
 from fastapi import UploadFile
@@ -13,11 +13,17 @@ from app.repositories import file_repository
 from app.services import csv_handler
 
 
-def _build_sanitized_csv(records: List[Dict], fields: List[str]) -> str:
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=fields)
-    writer.writeheader()
-    writer.writerows(records)
+def _build_sanitized_csv(records: List[Dict], fields: List[str]) -> bytes:
+    # Plain csv.writer with the schema fixed up front: DictWriter would re-check
+    # every row for keys outside 'fields', which parsed records never have.
+    # Encoding through the buffered wrapper avoids holding a full str copy too.
+    output = BytesIO()
+    text = TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    writer.writerows([record.get(col, "") for col in fields] for record in records)
+    text.flush()
+    text.detach()
     return output.getvalue()
 
 
@@ -41,7 +47,7 @@ async def save_upload(file: UploadFile, id_field: Optional[str] = None) -> Dict:
         records, fields = await csv_handler.process_csv_content(content_str, id_field)
         clean_csv_content = _build_sanitized_csv(records, fields)
         processed_file_id = await file_repository.save_processed_file(
-            clean_csv_content.encode("utf-8"), file.filename
+            clean_csv_content, file.filename
         )
 
         await file_repository.update_file_status(
@@ -121,8 +127,7 @@ async def download_processed_file(file_id: str) -> Tuple[bytes, str]:
 
     records, fields = await csv_handler.process_csv_content(raw_content)
 
-    clean_csv_content = _build_sanitized_csv(records, fields)
-    processed_bytes = clean_csv_content.encode("utf-8")
+    processed_bytes = _build_sanitized_csv(records, fields)
     processed_file_id = await file_repository.save_processed_file(
         processed_bytes, doc["filename"]
     )
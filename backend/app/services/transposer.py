@@ -5,15 +5,27 @@ Handles vertical Key-Value pair streams in memory.
 
 import csv
 import logging
+import sys
 from io import StringIO  # <--- Crucial Import
-from typing import List, Dict, Tuple
-from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional
 
 from app.utils.sanitize import sanitize_cell_value
 
 logger = logging.getLogger(__name__)
 
 
+def _build_record(fields: List[str], values: List[Optional[str]]) -> Dict:
+    """
+    Maps positional raw values back to field names, skipping unseen fields.
+    Sanitization runs here, once per surviving value, instead of per input row.
+    """
+    return {
+        field: sanitize_cell_value(value)
+        for field, value in zip(fields, values)
+        if value is not None
+    }
+
+
 def parse_vertical_csv(
     content: str, dialect: csv.Dialect
 ) -> Tuple[List[Dict], List[str]]:
@@ -24,9 +36,12 @@ def parse_vertical_csv(
     reader = csv.reader(text_io, dialect=dialect)
 
     fields: List[str] = []
+    field_index: Dict[str, int] = {}
     records: List[Dict] = []
 
-    current_record = OrderedDict()
+    # Raw values of the record being built, indexed by position in 'fields'.
+    # None marks a field the current record has not seen yet.
+    current_values: List[Optional[str]] = []
 
     try:
         for row in reader:
@@ -36,22 +51,29 @@ def parse_vertical_csv(
             key = row[0].strip() if row[0] else ""
             if not key:
                 continue
+            # Keys repeat once per record; interning shares one string per field
+            key = sys.intern(key)
             # If line is "Key, Value", val is Value. If just "Key", val is empty.
             raw_val = row[1] if len(row) > 1 else ""
-            val = sanitize_cell_value(raw_val)
+
+            index = field_index.get(key)
 
             # Logic: If we see the first field again, it's a new record
-            if fields and key == fields[0] and (key in current_record):
-                records.append(dict(current_record))
-                current_record = OrderedDict()
+            if index == 0 and current_values[0] is not None:
+                records.append(_build_record(fields, current_values))
+                current_values = [None] * len(fields)
 
-            if key not in fields:
+            if index is None:
+                index = len(fields)
+                field_index[key] = index
                 fields.append(key)
+                current_values.append(None)
 
-            current_record[key] = val
+            # Keys repeated inside one record overwrite the raw value unsanitized
+            current_values[index] = raw_val
 
-        if current_record:
-            records.append(dict(current_record))
+        if any(value is not None for value in current_values):
+            records.append(_build_record(fields, current_values))
 
         logger.info(
             "Transposition complete. Found %d detected fields and %d records.",
@@ -2,6 +2,10 @@
 Protect against CSV Injection:
 """
 
+# First characters that make spreadsheet apps evaluate a cell as a formula.
+# A set lookup on one character is cheaper than str.startswith() with a tuple.
+FORMULA_PREFIXES = frozenset("=+-@")
+
 
 def sanitize_cell_value(value: str) -> str:
     """
@@ -24,7 +28,7 @@ def sanitize_cell_value(value: str) -> str:
 
     # 2. Security Check (The "Protection" part)
     # If a field starts with strictly forbidden characters, prefix with single quote
-    if clean_value.startswith(("=", "+", "-", "@")):
+    if clean_value and clean_value[0] in FORMULA_PREFIXES:
         return f"'{clean_value}"
 
     return clean_value
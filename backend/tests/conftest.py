@@ -2,79 +2,276 @@
 Pytest configuration and global fixtures.
 """
 
-import sys
-import os
-
-# 1. Add the project root (backend) to sys.path immediately.
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-# pylint: disable=wrong-import-position
-import asyncio
-from unittest.mock import MagicMock, AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, AsyncMock
 import pytest
+import pytest_asyncio
 from bson import ObjectId
+from httpx import AsyncClient, ASGITransport
 from app.db.mongo import db_manager  # Import the REAL singleton
+from app.repositories import file_repository
 
-# pylint: enable=wrong-import-position
+# Shared fixture data, built once at import
+FIXED_OID = ObjectId("507f1f77bcf86cd799439011")
+DEFAULT_FILE_DOC = {
+    "_id": FIXED_OID,
+    "filename": "test.csv",
+    "status": "processed",
+    "records_count": 0,
+    "fields": [],
+}
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def _identity(data):
+    """Pass-through stand-in for encrypt_data/decrypt_data."""
+    return data
 
 
-@pytest.fixture
-def mock_db_manager():
+class FakeCursor:
     """
-    Mocks the Singleton DatabaseManager IN-PLACE.
+    Minimal stand-in for a Motor cursor: supports sort() chaining and 'async for'.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *_args, **_kwargs):
+        """Ordering is the caller's job; return self to keep the chain."""
+        return self
+
+    async def __aiter__(self):
+        for doc in self._docs:
+            yield doc
+
+
+class FakeDatabase(SimpleNamespace):
+    """
+    Attribute container for the database handle that also answers
+    db["<bucket>.files"] lookups, which SimpleNamespace alone cannot.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __getitem__(self, _name):
+        return self.gridfs_files
+
+
+class FakeGridOut:
+    """
+    Bytes-backed stand-in for a Motor GridOut: read() drains the buffer, then b"".
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        """Returns up to 'size' bytes (all remaining when negative)."""
+        end = len(self._data) if size < 0 else self._position + size
+        chunk = self._data[self._position : end]
+        self._position += len(chunk)
+        return chunk
+
+
+class MockMongo:
     """
-    # 1. Create Mocks
-    mock_fs = MagicMock()
-    mock_fs.bucket_name = "fs"
+    Mock MongoDB/GridFS objects, built once per session and reset per test.
+    Only awaited or asserted-on methods are mocks; the objects holding them
+    are plain namespaces.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+
+    def __init__(self):
+        # GridFS bucket methods
+        self.open_upload_stream = MagicMock()
+        self.upload_write = AsyncMock()
+        self.upload_close = AsyncMock()
+        self.fs_delete = AsyncMock()
+        # Bucket find() is synchronous and returns a cursor of GridOut objects
+        self.fs_find = MagicMock()
+
+        # 'files' metadata collection methods
+        # Motor's find() is synchronous and returns a cursor
+        self.find = MagicMock()
+        self.collection_methods = {
+            name: AsyncMock()
+            for name in (
+                "find_one",
+                "insert_one",
+                "update_one",
+                "delete_one",
+                "delete_many",
+                "create_index",
+            )
+        }
+        self.collection_methods["find"] = self.find
+
+        # Database handle methods
+        self.command = AsyncMock()
+        self.gridfs_find_one = AsyncMock()
+
+        # GridFS contents by str(file_id), served by open_download_stream
+        self.stored_files = {}
+
+        self.reset()
+
+    def _all_mocks(self):
+        yield from (
+            self.open_upload_stream,
+            self.upload_write,
+            self.upload_close,
+            self.fs_delete,
+            self.fs_find,
+            self.command,
+            self.gridfs_find_one,
+        )
+        yield from self.collection_methods.values()
 
-    # Configure Upload Stream
-    mock_upload_stream = AsyncMock()
-    # pylint: disable=protected-access
-    mock_upload_stream._id = ObjectId()
-    mock_fs.open_upload_stream.return_value = mock_upload_stream
+    def store(self, file_id, content):
+        """Makes open_download_stream(file_id) serve 'content'."""
+        self.stored_files[str(file_id)] = content
 
-    # Configure Download Stream
-    mock_download_stream = MagicMock()
-    # Default behavior: return a simple valid CSV to prevent processing crashes
-    mock_download_stream.read = AsyncMock(return_value=b"field1,field2\nvalue1,value2")
+    async def open_download_stream(self, file_id):
+        """
+        Serves stored content for known ids and the default stream otherwise.
+        A plain coroutine: no test asserts on downloads, so no AsyncMock is needed.
+        """
+        content = self.stored_files.get(str(file_id))
+        if content is None:
+            return self.download_stream
+        return FakeGridOut(content)
 
-    # Ensure open_download_stream returns an awaitable that resolves to our stream mock
-    mock_fs.open_download_stream = AsyncMock(return_value=mock_download_stream)
+    def set_find(self, docs):
+        """Sets the documents a files.find() cursor yields."""
+        self.find.return_value = FakeCursor(docs)
 
-    mock_fs.delete = AsyncMock()
-    mock_files_coll = AsyncMock()
+    def set_grid_files(self, file_ids):
+        """Sets the GridFS files (by _id) that fs_bucket.find() yields."""
+        self.fs_find.return_value = FakeCursor(
+            [SimpleNamespace(_id=file_id) for file_id in file_ids]
+        )
 
-    mock_gridfs_files = MagicMock()
-    mock_gridfs_files.find_one = AsyncMock(return_value=None)
+    def set_find_one(self, doc):
+        """Sets the document files.find_one() resolves to (None for a miss)."""
+        self.collection_methods["find_one"].return_value = doc
 
-    mock_db_obj = MagicMock()
-    mock_db_obj.files = mock_files_coll
-    mock_db_obj.command = AsyncMock(return_value={"ok": 1})
-    mock_db_obj.__getitem__.return_value = mock_gridfs_files
+    def reset(self):
+        """
+        Clears recorded calls and per-test overrides, then re-wires the defaults.
+        The namespaces are rebuilt rather than cleared, which drops any
+        attribute a test swapped in.
+        """
+        for mock in self._all_mocks():
+            mock.reset_mock(return_value=True, side_effect=True)
+
+        # Configure Upload Stream
+        self.upload_stream = SimpleNamespace(
+            _id=FIXED_OID, write=self.upload_write, close=self.upload_close
+        )
+        self.open_upload_stream.return_value = self.upload_stream
+
+        # Configure Download Stream
+        # Default behavior: return a simple valid CSV to prevent processing crashes
+        self.download_stream = FakeGridOut(b"field1,field2\nvalue1,value2")
+
+        self.stored_files.clear()
+
+        self.fs_bucket = SimpleNamespace(
+            bucket_name="fs",
+            open_upload_stream=self.open_upload_stream,
+            open_download_stream=self.open_download_stream,
+            delete=self.fs_delete,
+            find=self.fs_find,
+        )
+        self.set_grid_files([])
+
+        self.set_find([])
+        # Shallow copy: tests may mutate the returned document
+        self.collection_methods["find_one"].return_value = dict(DEFAULT_FILE_DOC)
+        self.files = SimpleNamespace(**self.collection_methods)
+
+        self.gridfs_find_one.return_value = None
+        self.gridfs_files = SimpleNamespace(find_one=self.gridfs_find_one)
+
+        self.command.return_value = {"ok": 1}
+        self.db = FakeDatabase(
+            files=self.files, command=self.command, gridfs_files=self.gridfs_files
+        )
+
+
+@pytest.fixture(scope="session", name="mock_mongo")
+def fixture_mock_mongo():
+    """Builds the mock MongoDB/GridFS tree once for the whole session."""
+    return MockMongo()
+
+
+@pytest.fixture(scope="session", name="passthrough_crypto")
+def fixture_passthrough_crypto():
+    """
+    Makes encrypt_data/decrypt_data a pass-through once for the whole session.
+    Tests that assert on encryption patch over it locally.
+    """
+    original_crypto = (file_repository.encrypt_data, file_repository.decrypt_data)
+    file_repository.encrypt_data = _identity
+    file_repository.decrypt_data = _identity
+
+    yield
+
+    file_repository.encrypt_data, file_repository.decrypt_data = original_crypto
+
+
+@pytest.fixture(name="mock_db_manager")
+def fixture_mock_db_manager(
+    mock_mongo, passthrough_crypto  # pylint: disable=unused-argument
+):
+    """
+    Mocks the Singleton DatabaseManager IN-PLACE.
+    """
+    # 1. Reset the shared mocks instead of rebuilding them
+    mock_mongo.reset()
 
     # 2. Save Original State
     original_fs = db_manager.fs_bucket
     original_db = db_manager.db
 
-    # 3. Apply Mocks
-    db_manager.fs_bucket = mock_fs
-    db_manager.db = mock_db_obj
+    # 3. Apply Mocks (plain attribute swaps, no patch() machinery)
+    db_manager.fs_bucket = mock_mongo.fs_bucket
+    db_manager.db = mock_mongo.db
 
-    # 4. Patch Encryption to be Pass-through
-    with patch(
-        "app.repositories.file_repository.encrypt_data", side_effect=lambda x: x
-    ), patch("app.repositories.file_repository.decrypt_data", side_effect=lambda x: x):
+    yield db_manager
 
-        yield db_manager
-
-    # 5. Teardown
+    # 4. Teardown
     db_manager.fs_bucket = original_fs
     db_manager.db = original_db
+
+
+@pytest_asyncio.fixture(scope="session", name="asgi_client")
+async def fixture_asgi_client():
+    """
+    One AsyncClient bound to the FastAPI app for the whole session.
+    Prefer 'api_client', which also mocks the database.
+    """
+    # Imported here so runs that never touch the API skip building the app
+    from app.main import app  # pylint: disable=import-outside-toplevel
+
+    # Unhandled app errors come back as 500 responses instead of being re-raised
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    # FIX: Enable follow_redirects to handle strict slash redirects (307 -> 200)
+    async with AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def api_client(mock_db_manager, asgi_client):  # pylint: disable=unused-argument
+    """
+    Shared AsyncClient for API tests.
+    CRITICAL: Depends on 'mock_db_manager' so the DB is mocked for every request.
+    """
+    return asgi_client
@@ -3,24 +3,22 @@ Integration tests for the file API endpoints (Async/FastAPI).
 Validates the full lifecycle: Upload -> Process -> List -> Delete -> Download.
 """
 
-from unittest.mock import MagicMock, AsyncMock, patch
 import pytest
-from httpx import AsyncClient, ASGITransport
 from bson import ObjectId
-from app.main import app
 
 # Define base URL for the API
 BASE_URL = "http://test/api/v1/files"
 
+# Upload and stored payloads, shared as bytes
+VALID_CSV = b"col1,col2\nval1,val2\nval3,val4"
+INJECTION_CSV = b"name,cmd\nAlice,=SUM(1+1)\nBob,+cmd|' /C calc'!'A1'"
+LIFECYCLE_CSV = b"id,name\n1,TestFlow"
+DOWNLOAD_CSV = b"col1,col2\nval1,val2"
 
-@pytest.fixture(name="api_client")
-async def fixture_api_client(mock_db_manager):  # pylint: disable=unused-argument
-    """Fixture creates an AsyncClient specifically for FastAPI testing."""
-    # FIX: Enable follow_redirects to handle strict slash redirects (307 -> 200)
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True
-    ) as client:
-        yield client
+# Fixed ids for tests that never assert on uniqueness
+FAKE_ID = ObjectId("507f1f77bcf86cd799439012")
+FAKE_ID_STR = str(FAKE_ID)
+PROCESSED_ID = ObjectId("507f1f77bcf86cd799439013")
 
 
 @pytest.mark.asyncio
@@ -51,21 +49,23 @@ async def test_readiness_check(api_client):
 
 
 @pytest.mark.asyncio
-async def test_upload_valid_csv(api_client, mock_db_manager):
+async def test_list_files_empty(api_client):
+    """Test listing files when the collection is empty."""
+    response = await api_client.get(f"{BASE_URL}/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_upload_valid_csv(api_client):
     """Test basic CSV file upload and processing."""
     # 1. Setup Data
-    csv_content = "col1,col2\nval1,val2\nval3,val4"
-    files = {"file": ("test_valid.csv", csv_content, "text/csv")}
+    files = {"file": ("test_valid.csv", VALID_CSV, "text/csv")}
 
-    # 2. Configure Mock to return THIS content when read back
-    mock_stream = MagicMock()
-    mock_stream.read = AsyncMock(return_value=csv_content.encode("utf-8"))
-    mock_db_manager.fs_bucket.open_download_stream.return_value = mock_stream
-
-    # 3. Request
+    # 2. Request
     response = await api_client.post(f"{BASE_URL}/upload", files=files)
 
-    # 4. Assert
+    # 3. Assert
     assert response.status_code in [200, 201]
     data = response.json()
     assert data["filename"] == "test_valid.csv"
@@ -75,15 +75,9 @@ async def test_upload_valid_csv(api_client, mock_db_manager):
 
 
 @pytest.mark.asyncio
-async def test_upload_sanitization(api_client, mock_db_manager):
+async def test_upload_sanitization(api_client):
     """Test upload sanitizes CSV injection attempts (Formula Injection)."""
-    csv_content = "name,cmd\nAlice,=SUM(1+1)\nBob,+cmd|' /C calc'!'A1'"
-    files = {"file": ("injection.csv", csv_content, "text/csv")}
-
-    # Configure Mock to return malicious content
-    mock_stream = MagicMock()
-    mock_stream.read = AsyncMock(return_value=csv_content.encode("utf-8"))
-    mock_db_manager.fs_bucket.open_download_stream.return_value = mock_stream
+    files = {"file": ("injection.csv", INJECTION_CSV, "text/csv")}
 
     response = await api_client.post(f"{BASE_URL}/upload", files=files)
     assert response.status_code in [200, 201]
@@ -96,7 +90,7 @@ async def test_upload_sanitization(api_client, mock_db_manager):
 @pytest.mark.asyncio
 async def test_upload_invalid_extension(api_client):
     """Test upload rejects non-CSV files (e.g., .txt)."""
-    files = {"file": ("test.txt", "some content", "text/plain")}
+    files = {"file": ("test.txt", b"some content", "text/plain")}
     response = await api_client.post(f"{BASE_URL}/upload", files=files)
     assert response.status_code == 400
 
@@ -104,18 +98,12 @@ async def test_upload_invalid_extension(api_client):
 
 
 @pytest.mark.asyncio
-async def test_upload_process_delete_flow(api_client, mock_db_manager):
+async def test_upload_process_delete_flow(api_client, mock_db_manager, mock_mongo):
     """
     Full Lifecycle Test: Upload -> List -> Delete
     """
     # 1. Upload
-    csv_content = "id,name\n1,TestFlow"
-    files = {"file": ("lifecycle.csv", csv_content, "text/csv")}
-
-    # Mock read back
-    mock_stream = MagicMock()
-    mock_stream.read = AsyncMock(return_value=csv_content.encode("utf-8"))
-    mock_db_manager.fs_bucket.open_download_stream.return_value = mock_stream
+    files = {"file": ("lifecycle.csv", LIFECYCLE_CSV, "text/csv")}
 
     upload_res = await api_client.post(f"{BASE_URL}/upload", files=files)
     assert upload_res.status_code in [200, 201]
@@ -132,15 +120,7 @@ async def test_upload_process_delete_flow(api_client, mock_db_manager):
         "records_count": 1,
     }
 
-    async def async_cursor_gen():
-        yield mock_file_doc
-
-    # Mock the Chain find().sort()
-    mock_cursor = MagicMock()
-    mock_cursor.sort.return_value = async_cursor_gen()
-
-    # Explicitly replace 'find' so it returns the mock cursor directly (sync-like)
-    mock_db_manager.db.files.find = MagicMock(return_value=mock_cursor)
+    mock_mongo.set_find([mock_file_doc])
 
     list_res = await api_client.get(f"{BASE_URL}/")
     assert list_res.status_code == 200
@@ -148,7 +128,7 @@ async def test_upload_process_delete_flow(api_client, mock_db_manager):
     assert any(f["id"] == file_id for f in all_files)
 
     # 3. Delete
-    mock_db_manager.db.files.find_one = AsyncMock(return_value=mock_file_doc)
+    mock_mongo.set_find_one(mock_file_doc)
     mock_db_manager.db.files.delete_one.return_value.deleted_count = 1
     delete_res = await api_client.delete(f"{BASE_URL}/{file_id}")
     assert delete_res.status_code == 200
@@ -160,43 +140,34 @@ async def test_upload_process_delete_flow(api_client, mock_db_manager):
 
 
 @pytest.mark.asyncio
-async def test_delete_nonexistent_file(api_client, mock_db_manager):
+async def test_delete_nonexistent_file(api_client, mock_db_manager, mock_mongo):
     """Test deleting a file that doesn't exist."""
-    fake_id = str(ObjectId())
-
     # Mock delete_one to return 0 deleted documents
-    mock_db_manager.db.files.find_one = AsyncMock(return_value=None)
+    mock_mongo.set_find_one(None)
     mock_db_manager.db.files.delete_one.return_value.deleted_count = 0
 
-    response = await api_client.delete(f"{BASE_URL}/{fake_id}")
+    response = await api_client.delete(f"{BASE_URL}/{FAKE_ID_STR}")
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"].lower()
 
 
 @pytest.mark.asyncio
-async def test_download_file(api_client, mock_db_manager):
+async def test_download_file(api_client, mock_mongo):
     """Test downloading a file."""
     # 1. Setup Mock
-    file_id = str(ObjectId())
     mock_doc = {
-        "_id": ObjectId(file_id),
+        "_id": FAKE_ID,
         "filename": "download.csv",
-        "processed_fs_id": ObjectId(),
+        "processed_fs_id": PROCESSED_ID,
     }
-    # AsyncMock for find_one since Motor is async here, but usually we mock the result directly
-    # Ideally find_one returns a coroutine.
-    mock_db_manager.db.files.find_one = AsyncMock(return_value=mock_doc)
-
-    # Mock content retrieval from repository
-    with patch(
-        "app.repositories.file_repository.get_file_content_as_bytes",
-        new_callable=AsyncMock,
-    ) as mock_get_content:
-        mock_get_content.return_value = b"col1,col2\nval1,val2"
-
-        # 2. Request
-        response = await api_client.get(f"{BASE_URL}/{file_id}/download")
+    mock_mongo.set_find_one(mock_doc)
+
+    # Serve the processed file from the mocked GridFS
+    mock_mongo.store(PROCESSED_ID, DOWNLOAD_CSV)
+
+    # 2. Request
+    response = await api_client.get(f"{BASE_URL}/{FAKE_ID_STR}/download")
 
     assert response.status_code == 200
     assert (
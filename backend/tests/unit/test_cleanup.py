@@ -3,47 +3,183 @@ Unit tests for the cleanup service.
 """
 
 # Standard library imports first
-from unittest.mock import patch, AsyncMock, MagicMock
+import asyncio
 
-# Third-party imports second
+# Third-party imports
 import pytest
+from bson import ObjectId
 
 # Local application imports last
-from app.services.cleanup import delete_expired_files
+from app.services.cleanup import (
+    MAX_CONCURRENT_DELETES,
+    RETENTION_PERIOD_SECONDS,
+    delete_expired_files,
+    ensure_retention_index,
+)
+
+DOC_ID = ObjectId("507f1f77bcf86cd799439011")
+PROCESSED_ID = ObjectId("507f1f77bcf86cd799439013")
+# Metadata as create_file_metadata writes it: the raw content shares the _id
+EXPIRED_DOC = {"_id": DOC_ID, "raw_fs_id": DOC_ID, "processed_fs_id": PROCESSED_ID}
+
+
+async def _cursor(docs):
+    for doc in docs:
+        yield doc
+
+
+def _serve_metadata(mock_mongo, expired=(), live=()):
+    """
+    Routes files.find(): the expiry query (on 'created_at') yields 'expired',
+    the GridFS reference lookups yield 'live'.
+    """
+    mock_mongo.find.side_effect = lambda query, *_args: _cursor(
+        expired if "created_at" in query else live
+    )
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_old_files(mock_db_manager, mock_mongo):
+    """
+    Tests if the cleanup job finds old, unreferenced GridFS files and deletes each one.
+    """
+    # 1. Setup - Mock GridFS cursor
+    expired_ids = [
+        ObjectId("507f1f77bcf86cd799439011"),
+        ObjectId("507f1f77bcf86cd799439012"),
+    ]
+    mock_mongo.set_grid_files(expired_ids)
+
+    # 2. Execute
+    await delete_expired_files()
+
+    # 3. Asserts
+    find = mock_db_manager.fs_bucket.find
+    assert find.call_count == 1
+    query = find.call_args.args[0]
+
+    # Ensure query uses $lt (less than) on the GridFS uploadDate
+    assert "uploadDate" in query
+    assert "$lt" in query["uploadDate"]
+
+    # Verify every expired file was deleted from GridFS
+    deleted_ids = [
+        call.args[0] for call in mock_db_manager.fs_bucket.delete.await_args_list
+    ]
+    assert sorted(deleted_ids) == expired_ids
+
+
+@pytest.mark.asyncio
+async def test_cleanup_continues_after_failed_delete(mock_db_manager, mock_mongo):
+    """
+    A failing delete is logged and does not stop the rest of the sweep.
+    """
+    expired_ids = [
+        ObjectId("507f1f77bcf86cd799439011"),
+        ObjectId("507f1f77bcf86cd799439012"),
+    ]
+    mock_mongo.set_grid_files(expired_ids)
+    mock_mongo.fs_delete.side_effect = [Exception("chunk missing"), None]
+
+    await delete_expired_files()
+
+    assert mock_db_manager.fs_bucket.delete.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_retention_index_creates_ttl_index(mock_db_manager):
+    """
+    Metadata expiry is delegated to a TTL index on 'created_at'.
+    """
+    await ensure_retention_index()
+
+    create_index = mock_db_manager.db.files.create_index
+    assert create_index.await_count == 1
+    assert create_index.await_args.args == ([("created_at", 1)],)
+    assert create_index.await_args.kwargs == {
+        "expireAfterSeconds": RETENTION_PERIOD_SECONDS
+    }
+
+
+@pytest.mark.asyncio
+async def test_cleanup_expires_metadata_without_ttl_index(mock_db_manager, mock_mongo):
+    """
+    Metadata still expires when the TTL index cannot be created, and the
+    index creation is retried on the next sweep.
+    """
+    create_index = mock_db_manager.db.files.create_index
+    create_index.side_effect = Exception("IndexOptionsConflict")
+    _serve_metadata(mock_mongo, expired=[EXPIRED_DOC])
+
+    await delete_expired_files()
+    await delete_expired_files()
+
+    assert create_index.await_count == 2
+    delete_many = mock_db_manager.db.files.delete_many
+    assert delete_many.await_count == 2
+    assert delete_many.await_args.args == ({"_id": {"$in": [DOC_ID]}},)
+    expiry_query = mock_db_manager.db.files.find.call_args_list[0].args[0]
+    assert "$lt" in expiry_query["created_at"]
 
 
 @pytest.mark.asyncio
-async def test_cleanup_deletes_old_files(mock_db_manager):
+async def test_cleanup_deletes_recent_content_of_expired_upload(
+    mock_db_manager, mock_mongo
+):
     """
-    Tests if the cleanup job finds old files and calls delete.
+    A processed file regenerated shortly before expiry is newer than the
+    cutoff, but still goes with the expired metadata that references it.
     """
-    # 1. Setup - Mock Mongo cursor
-    expired_file_id = "507f1f77bcf86cd799439011"
-    mock_doc = {"_id": expired_file_id}
+    _serve_metadata(mock_mongo, expired=[EXPIRED_DOC])
+    # Only the raw content is old enough to match the GridFS age query,
+    # and it is gone by the time that query runs
+    mock_mongo.set_grid_files([])
 
-    # Define an async generator to simulate the MongoDB cursor
-    async def mock_cursor_generator():
-        yield mock_doc
+    await delete_expired_files()
 
-    # --- KEY FIX ---
-    # Convert 'find' to MagicMock so it returns the generator IMMEDIATELY
-    # instead of returning a coroutine (which AsyncMock does by default).
-    mock_db_manager.db.files.find = MagicMock(return_value=mock_cursor_generator())
+    deleted_ids = {
+        call.args[0] for call in mock_db_manager.fs_bucket.delete.await_args_list
+    }
+    assert deleted_ids == {DOC_ID, PROCESSED_ID}
+    mock_db_manager.db.files.delete_many.assert_awaited_once_with(
+        {"_id": {"$in": [DOC_ID]}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_cleanup_keeps_content_still_referenced(mock_db_manager, mock_mongo):
+    """
+    Old GridFS content is kept while metadata that has not expired yet still
+    references it (the raw file is written just before its metadata).
+    """
+    _serve_metadata(mock_mongo, live=[EXPIRED_DOC])
+    mock_mongo.set_grid_files([DOC_ID])
+
+    await delete_expired_files()
+
+    mock_db_manager.fs_bucket.delete.assert_not_awaited()
+    mock_db_manager.db.files.delete_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_bounds_concurrent_deletes(mock_db_manager, mock_mongo):
+    """
+    A large backlog is deleted in batches, never exceeding the concurrency limit.
+    """
+    expired_ids = [ObjectId() for _ in range(MAX_CONCURRENT_DELETES * 2 + 3)]
+    mock_mongo.set_grid_files(expired_ids)
+    in_flight = peak = 0
 
-    # 2. Execute intercepting file_repository.delete_file
-    with patch(
-        "app.services.cleanup.file_repository.delete_file", new_callable=AsyncMock
-    ) as mock_delete_fn:
-        await delete_expired_files()
+    async def slow_delete(_fs_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
 
-        # 3. Asserts
-        mock_db_manager.db.files.find.assert_called_once()
-        args, _ = mock_db_manager.db.files.find.call_args
-        query = args[0]
+    mock_mongo.fs_delete.side_effect = slow_delete
 
-        # Ensure query uses $lt (less than) on created_at
-        assert "created_at" in query
-        assert "$lt" in query["created_at"]
+    await delete_expired_files()
 
-        # Verify if delete function was called with correct ID
-        mock_delete_fn.assert_called_once_with(expired_file_id)
+    assert mock_db_manager.fs_bucket.delete.await_count == len(expired_ids)
+    assert peak == MAX_CONCURRENT_DELETES
@@ -2,7 +2,7 @@
 Unit tests for record grouping in the CSV handler.
 """
 
-from app.services.csv_handler import _group_records_by_id
+from app.services.csv_handler import _group_records_by_id, _parse_csv_sync
 
 
 def test_group_records_by_id_without_id_field_returns_input():
@@ -34,3 +34,16 @@ def test_group_records_by_id_merges_records_and_preserves_order():
     assert grouped[1]["id"] == "2"
     assert grouped[2]["id"] == ""
     assert "id" not in grouped[3]
+
+
+def test_parse_csv_groups_rows_while_reading():
+    content = "id,name,age\n1,Alice,30\n2,Bob,\n1,,31\n,NoId,40"
+
+    records, fields = _parse_csv_sync(content, " id ")
+
+    assert fields == ["id", "name", "age"]
+    assert records == [
+        {"id": "1", "name": "Alice", "age": "31"},
+        {"id": "2", "name": "Bob", "age": ""},
+        {"id": "", "name": "NoId", "age": "40"},
+    ]
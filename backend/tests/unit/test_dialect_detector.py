@@ -2,127 +2,163 @@
 Unit tests for the Dialect Detector service.
 """
 
-import unittest
+# pytest injects the module fixtures below by parameter name
+# pylint: disable=redefined-outer-name
+
+from typing import NamedTuple, Optional
+from unittest.mock import patch
+
+import pytest
 
-# import csv
 from app.services.dialect_detector import DialectDetector
 
 
-class TestDialectDetector(unittest.TestCase):
-    """Test suite for CSV dialect detection logic."""
-
-    def setUp(self):
-        self.detector = DialectDetector()
-
-    def test_standard_comma_separated(self):
-        """
-        Scenario: Standard CSV file with a header and consistent rows.
-        Paper: Represents a 'clean' dataset where Pattern Score is high (1.0).
-        """
-        content = (
-            "id,name,date\n"
-            "1,Alice,2023-01-01\n"
-            "2,Bob,2023-01-02\n"
-            "3,Charlie,2023-01-03"
-        )
-        dialect = self.detector.detect(content)
-        self.assertEqual(dialect.delimiter, ",")
-        self.assertEqual(dialect.quotechar, '"')
-
-    def test_semicolon_with_comma_decimals(self):
-        """
-        Scenario: European format using semicolons as delimiters and commas for decimals.
-        Paper: Validates that Type Score correctly identifies floats like '1,5'.
-        """
-        content = """Measure;Value;Date
-Temp;37,5;2023-10-01
-Press;1013,2;2023-10-01"""
-        dialect = self.detector.detect(content)
-        self.assertEqual(dialect.delimiter, ";")
-
-    def test_single_column_integers(self):
-        """
-        Scenario: A single column of IDs.
-        Paper Check: This tests the 'Alpha' constant.
-        Without Alpha, Pattern Score would be 0 and fail.
-        """
-        content = "1001\n1002\n1003\n1004"
-        dialect = self.detector.detect(content)
-
-        # Verify internal parsing
-        # pylint: disable=protected-access
-        rows = self.detector._parse_sample(
-            content, dialect.delimiter, dialect.quotechar
-        )
-        self.assertTrue(
-            all(len(r) == 1 for r in rows), "Should be parsed as single column"
-        )
-
-    def test_mixed_types_single_column(self):
-        """
-        Scenario: Single column with mixed integers, strings, and dates.
-        Paper Check: Tests the Type Score robustness.
-        """
-        content = "12345\nProduct_A\n2023-12-25\nadmin@example.com"
-        dialect = self.detector.detect(content)
-
-        # pylint: disable=protected-access
-        rows = self.detector._parse_sample(
-            content, dialect.delimiter, dialect.quotechar
-        )
-        self.assertEqual(len(rows), 4)
-        self.assertEqual(len(rows[0]), 1)
-
-    def test_messy_quotes(self):
-        """
-        Scenario: Fields containing the delimiter inside quotes.
-        Paper: Tests that parser respects quotes to maintain Pattern Score.
-        """
-        content = (
-            "id,description,total\n"
-            '1,"Item A, with comma",500\n'
-            '2,"Item B; with semicolon",600\n'
-            '3,"Item C",700'
-        )
-        dialect = self.detector.detect(content)
-        self.assertEqual(dialect.delimiter, ",")
-        self.assertEqual(dialect.quotechar, '"')
-
-        # Verify it actually parsed the quoted field correctly
-        # pylint: disable=protected-access
-        rows = self.detector._parse_sample(
-            content, dialect.delimiter, dialect.quotechar
-        )
-        self.assertEqual(len(rows[1]), 3)
-        self.assertEqual(rows[1][1], "Item A, with comma")
-
-    def test_pipe_delimiter(self):
-        """Scenario: Non-standard delimiter (|)."""
-        content = "name|age|email\nalice|30|a@b.com\nbob|25|b@c.com"
-        dialect = self.detector.detect(content)
-        self.assertEqual(dialect.delimiter, "|")
-
-    def test_single_line_header(self):
-        """
-        Scenario: Only headers, no data.
-        Paper: Pattern Score should still work on single row pattern.
-        """
-        content = "col1,col2,col3"
-        dialect = self.detector.detect(content)
-        self.assertEqual(dialect.delimiter, ",")
-
-    def test_garbage_fallback(self):
-        """
-        Scenario: Complete garbage input.
-        Paper: Should fallback to defaults (Excel) rather than crash.
-        """
-        content = "!!!@@@###$$$%%%^^^&&&***((("
-        dialect = self.detector.detect(content)
-
-        # FIX: Check behavior (delimiter) instead of strict type inheritance
-        # self.assertIsInstance(dialect, csv.Dialect) <--- REMOVE THIS
-        self.assertEqual(dialect.delimiter, ",")  # Default fallback
-
-
-if __name__ == "__main__":
-    unittest.main()
+class Sample(NamedTuple):
+    """A detector input and the dialect it should resolve to (None: not asserted)."""
+
+    content: str
+    delimiter: Optional[str] = None
+    quotechar: Optional[str] = None
+
+
+SAMPLES = {
+    # Standard CSV file with a header and consistent rows.
+    # Paper: Represents a 'clean' dataset where Pattern Score is high (1.0).
+    "standard_comma_separated": Sample(
+        "id,name,date\n1,Alice,2023-01-01\n2,Bob,2023-01-02\n3,Charlie,2023-01-03",
+        delimiter=",",
+        quotechar='"',
+    ),
+    # European format using semicolons as delimiters and commas for decimals.
+    # Paper: Validates that Type Score correctly identifies floats like '1,5'.
+    "semicolon_with_comma_decimals": Sample(
+        "Measure;Value;Date\nTemp;37,5;2023-10-01\nPress;1013,2;2023-10-01",
+        delimiter=";",
+    ),
+    # A single column of IDs.
+    # Paper Check: This tests the 'Alpha' constant. Without Alpha, Pattern Score would be 0.
+    "single_column_integers": Sample("1001\n1002\n1003\n1004"),
+    # Single column with mixed integers, strings, and dates.
+    # Paper Check: Tests the Type Score robustness.
+    "mixed_types_single_column": Sample(
+        "12345\nProduct_A\n2023-12-25\nadmin@example.com"
+    ),
+    # Fields containing the delimiter inside quotes.
+    # Paper: Tests that parser respects quotes to maintain Pattern Score.
+    "messy_quotes": Sample(
+        'id,description,total\n1,"Item A, with comma",500\n'
+        '2,"Item B; with semicolon",600\n3,"Item C",700',
+        delimiter=",",
+        quotechar='"',
+    ),
+    # Non-standard delimiter (|).
+    "pipe_delimiter": Sample(
+        "name|age|email\nalice|30|a@b.com\nbob|25|b@c.com", delimiter="|"
+    ),
+    # Only headers, no data.
+    # Paper: Pattern Score should still work on single row pattern.
+    "single_line_header": Sample("col1,col2,col3", delimiter=","),
+    # Complete garbage input.
+    # Paper: Should fallback to defaults (Excel) rather than crash.
+    "garbage_fallback": Sample("!!!@@@###$$$%%%^^^&&&***(((", delimiter=","),
+}
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """The detector is stateless between detect() calls, so one instance serves the module."""
+    return DialectDetector()
+
+
+@pytest.fixture(scope="module", params=list(SAMPLES))
+def parsed(request, detector):
+    """
+    Detects each sample once and parses it with the detected dialect,
+    so every test on the same sample shares one (sample, dialect, rows) result.
+    """
+    sample = SAMPLES[request.param]
+    dialect = detector.detect(sample.content)
+    # pylint: disable=protected-access
+    rows = detector._parse_sample(sample.content, dialect.delimiter, dialect.quotechar)
+    return sample, dialect, rows
+
+
+def test_detects_expected_dialect(parsed):
+    """Every sample resolves to its expected delimiter and quote character."""
+    sample, dialect, _ = parsed
+    if sample.delimiter is not None:
+        assert dialect.delimiter == sample.delimiter
+    if sample.quotechar is not None:
+        assert dialect.quotechar == sample.quotechar
+
+
+@pytest.mark.parametrize("parsed", ["single_column_integers"], indirect=True)
+def test_single_column_integers(parsed):
+    """Single-column input should be parsed as a single column."""
+    _, _, rows = parsed
+    assert all(len(r) == 1 for r in rows), "Should be parsed as single column"
+
+
+@pytest.mark.parametrize("parsed", ["mixed_types_single_column"], indirect=True)
+def test_mixed_types_single_column(parsed):
+    """Mixed-type single-column input keeps one value per row."""
+    _, _, rows = parsed
+    assert len(rows) == 4
+    assert len(rows[0]) == 1
+
+
+@pytest.mark.parametrize("parsed", ["messy_quotes"], indirect=True)
+def test_messy_quotes(parsed):
+    """Verify the quoted field was actually parsed correctly."""
+    _, _, rows = parsed
+    assert len(rows[1]) == 3
+    assert rows[1][1] == "Item A, with comma"
+
+
+def test_no_candidate_characters_skips_scoring(detector):
+    """
+    Scenario: No delimiter or quote character anywhere in the sample.
+    Every candidate would parse it the same way, so scoring is skipped.
+    """
+    content = "1001\n1002\n1003"
+    with patch.object(detector, "_parse_sample") as mock_parse:
+        dialect = detector.detect(content)
+
+    mock_parse.assert_not_called()
+    assert dialect.delimiter == ","
+    assert dialect.quotechar == '"'
+
+
+def test_equivalent_candidates_scored_once(detector):
+    """
+    Scenario: Only ',' appears in the sample, with no quote characters.
+    Candidates differing only in absent characters parse identically and are scored once.
+    """
+    content = "id,name\n1,Alice\n2,Bob"
+    # pylint: disable=protected-access
+    with patch.object(
+        detector, "_parse_sample", wraps=detector._parse_sample
+    ) as mock_parse:
+        dialect = detector.detect(content)
+
+    assert dialect.delimiter == ","
+    parsed_with = [call.args[1:] for call in mock_parse.call_args_list]
+    # One comma parse plus one representative for the absent delimiters
+    assert parsed_with == [(",", '"'), (";", '"')]
+
+
+def test_sample_truncation(detector):
+    """
+    Scenario: A multi-megabyte upload.
+    Only the first 'sample_size' characters are scored, whatever the input size.
+    """
+    content = "id,name\n" + "1,Alice\n" * 1_000_000
+    # pylint: disable=protected-access
+    with patch.object(
+        detector, "_parse_sample", wraps=detector._parse_sample
+    ) as mock_parse:
+        dialect = detector.detect(content)
+
+    assert dialect.delimiter == ","
+    sampled = {len(call.args[0]) for call in mock_parse.call_args_list}
+    assert sampled == {detector.sample_size}
@@ -10,13 +10,17 @@ import pytest
 
 from app.services.csv_handler import (
     _parse_csv_sync,
+    _parse_horizontal,
     _detect_dialect,
     process_csv_content,
-    _sanitize_row,
 )
 from app.services.dialect_detector import DialectDetector
 from app.repositories import file_repository
 
+# Shared samples, built once at import
+COMMA_CSV = "col1,col2\nval1,val2"
+PIPE_CSV = "col1|col2\nval1|val2"
+
 # --- 1. CSV Handler Edge Cases ---
 
 
@@ -27,66 +31,71 @@ def test_handler_empty_content():
     assert not fields
 
 
+def test_handler_whitespace_only_content_skips_detection():
+    """Hits: content.isspace() short-circuit before dialect detection"""
+    with patch("app.services.csv_handler._detect_dialect") as mock_detect:
+        records, fields = _parse_csv_sync(" \n\r\n\t")
+
+    mock_detect.assert_not_called()
+    assert not records
+    assert not fields
+
+
 def test_handler_dialect_detection_failure():
     """Hits: except Exception as error (fallback to excel)"""
     with patch(
         "app.services.csv_handler.DialectDetector.detect", side_effect=Exception("Boom")
     ):
         # Should not raise, but log warning and use Excel
-        dialect = _detect_dialect("col1,col2\nval1,val2")
+        dialect = _detect_dialect(COMMA_CSV)
         assert dialect.delimiter == ","  # Excel default
 
 
-def test_handler_csv_error_during_parsing():
-    """Hits: except csv.Error as error"""
-    # Create a content that looks valid
-    content = "col1,col2\nval1,val2"
+class StrictExcel(csv.excel):
+    """Excel dialect that raises csv.Error on malformed quoting instead of guessing."""
 
-    # Mock DictReader to raise error during iteration
-    with patch("csv.DictReader") as mock_reader:
-        instance = mock_reader.return_value
-        instance.fieldnames = ["col1", "col2"]
-        # Simulate normal iteration then crash
-        instance.__iter__.side_effect = csv.Error("Corrupt row")
+    strict = True
 
-        records, fields = _parse_csv_sync(content)
 
-        # It should catch the error and return empty or partial records
-        assert not records
-        assert fields == ["col1", "col2"]
+def test_handler_csv_error_during_parsing():
+    """Hits: except csv.Error as error"""
+    # Valid header and first row, then an unterminated quote at end of data
+    content = COMMA_CSV + '\n"broken'
 
+    records, fields = _parse_horizontal(content, StrictExcel, "")
 
-def test_handler_malformed_rows():
-    """Hits: if field: check and None value safeguards"""
-    # Manually construct a row that DictReader might yield for bad data
-    # Row with None key (extra field) and None value
-    bad_row = {None: ["extra"], "col1": None, "col2": " val "}
+    # It should catch the error and keep the rows read before the fault
+    assert records == [{"col1": "val1", "col2": "val2"}]
+    assert fields == ["col1", "col2"]
 
-    with patch("csv.DictReader") as mock_reader:
-        instance = mock_reader.return_value
-        instance.fieldnames = ["col1", "col2"]
-        instance.__iter__.return_value = [bad_row]
 
-        records, _ = _parse_csv_sync("dummy")
+def test_handler_malformed_rows():
+    """Hits: short-row padding, extra cells and blank header names"""
+    content = "col1,,col2\n\n val ,ignored\n1,2,3,extra"
 
-    assert "col1" in records[0]
-    assert records[0]["col1"] == ""
+    with patch("app.services.csv_handler._is_vertical_layout", return_value=False):
+        records, fields = _parse_csv_sync(content)
 
-    # FIX: Expect 'val' (stripped) instead of ' val '
-    # The sanitize_cell_value function uses .strip(), so this is the correct expected behavior.
-    assert records[0]["col2"] == "val"
+    assert fields == ["col1", "col2"]
+    # The blank line is skipped and the short row is padded with ""
+    assert records[0] == {"col1": "val", "col2": ""}
+    # Cells under a blank header name and beyond the header are dropped
+    assert records[1] == {"col1": "1", "col2": "3"}
 
 
-def test_handler_sanitize_row_empty():
-    """Hits: _sanitize_row returning None when no usable fields exist."""
-    sanitized = _sanitize_row({None: "value"})
-    assert sanitized is None
+def test_handler_blank_header_yields_no_records():
+    """Hits: rows are skipped when no usable column names exist."""
+    records, fields = _parse_csv_sync(",\nvalue,other")
+    assert not records
+    assert not fields
 
 
-def test_handler_sanitize_row_strips_fields():
-    """Hits: field/value cleanup in _sanitize_row."""
-    sanitized = _sanitize_row({" col ": " value "})
-    assert sanitized["col"] == "value"
+def test_handler_header_names_are_stripped():
+    """Hits: field/value cleanup of the header and cells."""
+    with patch("app.services.csv_handler._is_vertical_layout", return_value=False):
+        records, fields = _parse_csv_sync(" col \n value ")
+    assert fields == ["col"]
+    assert records[0]["col"] == "value"
 
 
 @pytest.mark.asyncio
@@ -110,7 +119,7 @@ def test_detector_candidate_exception():
         detector, "_calculate_pattern_score", side_effect=ValueError("Math error")
     ):
         # Should catch exception and continue to next candidate/fallback
-        dialect = detector.detect("col1|col2\nval1|val2")
+        dialect = detector.detect(PIPE_CSV)
         # Should fallback to Excel (comma) since pipe failed
         assert dialect.delimiter == ","
 
@@ -124,7 +133,7 @@ def test_detector_registration_error():
         # Mock register_dialect to fail (e.g., name already exists)
         with patch("csv.register_dialect", side_effect=csv.Error("Exists")):
             # Should catch error and proceed
-            dialect = detector.detect("a,b\n1,2")
+            dialect = detector.detect(COMMA_CSV)
             assert dialect.delimiter == ","
 
 
@@ -8,15 +8,18 @@ from bson import ObjectId
 
 from app.services import file_service
 
+# Fixed ids: the service only passes them through
+FILE_ID = ObjectId("507f1f77bcf86cd799439012")
+FILE_ID_STR = str(FILE_ID)
+PROCESSED_ID = ObjectId("507f1f77bcf86cd799439013")
+
 
 @pytest.mark.asyncio
 async def test_download_processed_file_uses_cached_processed_file():
-    file_id = str(ObjectId())
-    processed_id = ObjectId()
     mock_doc = {
-        "_id": ObjectId(file_id),
+        "_id": FILE_ID,
         "filename": "cached.csv",
-        "processed_fs_id": processed_id,
+        "processed_fs_id": PROCESSED_ID,
     }
 
     with patch(
@@ -29,18 +32,16 @@ async def test_download_processed_file_uses_cached_processed_file():
         mock_meta.return_value = mock_doc
         mock_bytes.return_value = b"col1\nval1"
 
-        payload, filename = await file_service.download_processed_file(file_id)
+        payload, filename = await file_service.download_processed_file(FILE_ID_STR)
 
     assert payload == b"col1\nval1"
     assert filename == "cached.csv"
-    mock_bytes.assert_awaited_once_with(processed_id)
+    mock_bytes.assert_awaited_once_with(PROCESSED_ID)
 
 
 @pytest.mark.asyncio
 async def test_download_processed_file_backfills_processed_file():
-    file_id = str(ObjectId())
-    processed_id = ObjectId()
-    mock_doc = {"_id": ObjectId(file_id), "filename": "raw.csv"}
+    mock_doc = {"_id": FILE_ID, "filename": "raw.csv"}
 
     with patch(
         "app.services.file_service.file_repository.get_file_metadata",
@@ -61,20 +62,29 @@ async def test_download_processed_file_backfills_processed_file():
         mock_meta.return_value = mock_doc
         mock_raw.return_value = "col1,col2\n1,2"
         mock_process.return_value = ([{"col1": "1", "col2": "2"}], ["col1", "col2"])
-        mock_save.return_value = processed_id
+        mock_save.return_value = PROCESSED_ID
 
-        payload, filename = await file_service.download_processed_file(file_id)
+        payload, filename = await file_service.download_processed_file(FILE_ID_STR)
 
     assert b"col1,col2" in payload
     assert b"1,2" in payload
     assert filename == "raw.csv"
     mock_save.assert_awaited_once()
     mock_update.assert_awaited_once_with(
-        file_id,
+        FILE_ID_STR,
         status="processed",
         updates={
             "fields": ["col1", "col2"],
             "records_count": 1,
-            "processed_fs_id": processed_id,
+            "processed_fs_id": PROCESSED_ID,
         },
     )
+
+
+def test_build_sanitized_csv_fills_missing_fields():
+    # pylint: disable=protected-access
+    payload = file_service._build_sanitized_csv(
+        [{"id": "1", "name": "Alice"}, {"id": "2"}], ["id", "name"]
+    )
+
+    assert payload.splitlines() == [b"id,name", b"1,Alice", b"2,"]
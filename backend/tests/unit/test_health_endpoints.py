@@ -2,8 +2,6 @@
 Unit tests for health API endpoints.
 """
 
-from unittest.mock import AsyncMock, MagicMock
-
 import pytest
 from fastapi import Response, status
 
@@ -33,16 +31,9 @@ async def test_readiness_check_db_and_gridfs_not_initialized(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_readiness_check_mongo_ping_failure_marks_gridfs_unavailable(
-    monkeypatch,
-):
-    mock_db = MagicMock()
-    mock_db.command = AsyncMock(side_effect=Exception("ping failed"))
-
-    mock_fs = MagicMock()
-    mock_fs.bucket_name = "fs"
-
-    monkeypatch.setattr(db_manager, "db", mock_db)
-    monkeypatch.setattr(db_manager, "fs_bucket", mock_fs)
+    mock_db_manager, mock_mongo
+):  # pylint: disable=unused-argument
+    mock_mongo.command.side_effect = Exception("ping failed")
 
     response = Response()
     payload = await readiness_check(response)
@@ -54,19 +45,10 @@ async def test_readiness_check_mongo_ping_failure_marks_gridfs_unavailable(
 
 
 @pytest.mark.asyncio
-async def test_readiness_check_gridfs_query_failure(monkeypatch):
-    mock_db = MagicMock()
-    mock_db.command = AsyncMock(return_value={"ok": 1})
-
-    mock_gridfs_files = MagicMock()
-    mock_gridfs_files.find_one = AsyncMock(side_effect=Exception("gridfs down"))
-    mock_db.__getitem__.return_value = mock_gridfs_files
-
-    mock_fs = MagicMock()
-    mock_fs.bucket_name = "fs"
-
-    monkeypatch.setattr(db_manager, "db", mock_db)
-    monkeypatch.setattr(db_manager, "fs_bucket", mock_fs)
+async def test_readiness_check_gridfs_query_failure(
+    mock_db_manager, mock_mongo
+):  # pylint: disable=unused-argument
+    mock_mongo.gridfs_find_one.side_effect = Exception("gridfs down")
 
     response = Response()
     payload = await readiness_check(response)
@@ -78,20 +60,8 @@ async def test_readiness_check_gridfs_query_failure(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_readiness_check_ok(monkeypatch):
-    mock_db = MagicMock()
-    mock_db.command = AsyncMock(return_value={"ok": 1})
-
-    mock_gridfs_files = MagicMock()
-    mock_gridfs_files.find_one = AsyncMock(return_value={"_id": "x"})
-    mock_db.__getitem__.return_value = mock_gridfs_files
-
-    mock_fs = MagicMock()
-    mock_fs.bucket_name = "fs"
-
-    monkeypatch.setattr(db_manager, "db", mock_db)
-    monkeypatch.setattr(db_manager, "fs_bucket", mock_fs)
-
+async def test_readiness_check_ok(mock_db_manager):
+    # The shared fake answers the ping and the '<bucket>.files' lookup
     response = Response()
     payload = await readiness_check(response)
 
@@ -100,3 +70,4 @@ async def test_readiness_check_ok(monkeypatch):
     assert payload["dependencies"]["mongo"]["status"] == "ok"
     assert payload["dependencies"]["gridfs"]["status"] == "ok"
     assert payload["dependencies"]["gridfs"]["bucket"] == "fs"
+    mock_db_manager.db.command.assert_awaited_once_with("ping")
@@ -2,15 +2,22 @@
 Unit tests for storage security (Encryption/Decryption).
 """
 
-from unittest.mock import patch, AsyncMock, MagicMock, call
+from unittest.mock import patch
 import pytest
 from bson import ObjectId
 
 from app.repositories import file_repository
 
+# Fixed ids: none of these tests depend on uniqueness
+FILE_ID = ObjectId("507f1f77bcf86cd799439012")
+FILE_ID_STR = str(FILE_ID)
+PROCESSED_ID = ObjectId("507f1f77bcf86cd799439013")
+
 
 @pytest.mark.asyncio
-async def test_save_file_encrypts_data(mock_db_manager):
+async def test_save_file_encrypts_data(
+    mock_db_manager, mock_mongo  # pylint: disable=unused-argument
+):
     """
     Tests if the file is encrypted before being saved to GridFS.
     """
@@ -18,54 +25,38 @@ async def test_save_file_encrypts_data(mock_db_manager):
     filename = "test_secure.csv"
     raw_content = b"user,email\n1,test@test.com"
 
-    # Mock the GridFS upload stream
-    grid_in_mock = AsyncMock()
-    # pylint: disable=protected-access
-    grid_in_mock._id = ObjectId()
-
-    # open_upload_stream is synchronous in Motor (returns a stream), so simple return_value works
-    mock_db_manager.fs_bucket.open_upload_stream.return_value = grid_in_mock
-
     # 2. Execute and Intercept Encryption
+    # The session stub makes crypto a pass-through; this test re-patches it to see the handoff
     with patch("app.repositories.file_repository.encrypt_data") as mock_encrypt:
         mock_encrypt.return_value = b"ENCRYPTED_BYTES"
 
         file_id = await file_repository.save_file(raw_content, filename)
 
-        # 3. Asserts
+        # 3. Asserts: only the encrypted payload reaches the shared upload stream
         mock_encrypt.assert_called_once_with(raw_content)
-        grid_in_mock.write.assert_awaited_once_with(b"ENCRYPTED_BYTES")
-        assert file_id == grid_in_mock._id
+        mock_mongo.upload_write.assert_awaited_once_with(b"ENCRYPTED_BYTES")
+        # pylint: disable=protected-access
+        assert file_id == mock_mongo.upload_stream._id
 
 
 @pytest.mark.asyncio
-async def test_get_file_decrypts_data(mock_db_manager):
+async def test_get_file_decrypts_data(
+    mock_db_manager, mock_mongo  # pylint: disable=unused-argument
+):
     """
     Tests if the file is decrypted when read from GridFS.
     """
     # 1. Setup
-    file_id = str(ObjectId())
     encrypted_content = b"ENCRYPTED_BYTES"
 
-    # Mock the download stream object
-    grid_out_mock = MagicMock()
-    grid_out_mock.read = AsyncMock(return_value=encrypted_content)
-
-    # --- FIX START ---
-    # The app code awaits this call: await open_download_stream(oid)
-    # Therefore, open_download_stream must be an AsyncMock (or return a Future).
-    # Setting it to AsyncMock(return_value=...) ensures calling it returns a coroutine
-    # that resolves to 'grid_out_mock'.
-    mock_db_manager.fs_bucket.open_download_stream = AsyncMock(
-        return_value=grid_out_mock
-    )
-    # --- FIX END ---
+    # Serve the encrypted bytes from the mocked GridFS
+    mock_mongo.store(FILE_ID_STR, encrypted_content)
 
     # 2. Execute
     with patch("app.repositories.file_repository.decrypt_data") as mock_decrypt:
         mock_decrypt.return_value = b"original,content"
 
-        result = await file_repository.get_file_content_as_string(file_id)
+        result = await file_repository.get_file_content_as_string(FILE_ID_STR)
 
         # 3. Asserts
         mock_decrypt.assert_called_once_with(encrypted_content)
@@ -73,37 +64,31 @@ async def test_get_file_decrypts_data(mock_db_manager):
 
 
 @pytest.mark.asyncio
-async def test_delete_file_success(mock_db_manager):
+async def test_delete_file_success(mock_db_manager, mock_mongo):
     """Test successful deletion of metadata and gridfs content."""
-    fake_id = str(ObjectId())
-    processed_id = ObjectId()
-    mock_doc = {"_id": ObjectId(fake_id), "processed_fs_id": processed_id}
+    mock_doc = {"_id": FILE_ID, "processed_fs_id": PROCESSED_ID}
 
-    mock_db_manager.db.files.find_one = AsyncMock(return_value=mock_doc)
+    mock_mongo.set_find_one(mock_doc)
 
     # Mock delete_one to return deleted_count=1
     mock_db_manager.db.files.delete_one.return_value.deleted_count = 1
 
     # Execute
-    result = await file_repository.delete_file(fake_id)
+    result = await file_repository.delete_file(FILE_ID_STR)
 
     assert result is True
-    # Ensure GridFS delete was called
-    mock_db_manager.fs_bucket.delete.assert_has_calls(
-        [call(ObjectId(fake_id)), call(processed_id)],
-        any_order=True,
-    )
+    # Ensure GridFS delete was called for the raw and processed content
+    deleted_ids = {c.args[0] for c in mock_db_manager.fs_bucket.delete.call_args_list}
+    assert deleted_ids == {FILE_ID, PROCESSED_ID}
 
 
 @pytest.mark.asyncio
-async def test_delete_file_not_found_in_metadata(mock_db_manager):
+async def test_delete_file_not_found_in_metadata(mock_db_manager, mock_mongo):
     """Test deletion when file does not exist in metadata."""
-    fake_id = str(ObjectId())
-
-    mock_db_manager.db.files.find_one = AsyncMock(return_value=None)
+    mock_mongo.set_find_one(None)
 
     # Execute
-    result = await file_repository.delete_file(fake_id)
+    result = await file_repository.delete_file(FILE_ID_STR)
 
     assert result is False
     mock_db_manager.db.files.delete_one.assert_not_called()
@@ -114,28 +99,25 @@ async def test_delete_file_not_found_in_metadata(mock_db_manager):
 @pytest.mark.asyncio
 async def test_update_file_status_sets_only_status(mock_db_manager):
     """Ensures update_file_status handles no extra updates."""
-    file_id = str(ObjectId())
-
-    await file_repository.update_file_status(file_id, status="pending", updates=None)
+    await file_repository.update_file_status(
+        FILE_ID_STR, status="pending", updates=None
+    )
 
     args, _ = mock_db_manager.db.files.update_one.call_args
-    assert args[0] == {"_id": ObjectId(file_id)}
+    assert args[0] == {"_id": FILE_ID}
     assert args[1] == {"$set": {"status": "pending"}}
 
 
 @pytest.mark.asyncio
 async def test_update_file_status_normalizes_updates(mock_db_manager):
     """Ensures update_file_status normalizes update payloads."""
-    file_id = str(ObjectId())
-    processed_id = ObjectId()
-
     await file_repository.update_file_status(
-        file_id,
+        FILE_ID_STR,
         status="processed",
         updates={
             "fields": ["col1"],
             "records_count": 1,
-            "processed_fs_id": str(processed_id),
+            "processed_fs_id": str(PROCESSED_ID),
             "error_message": "",
         },
     )
@@ -145,5 +127,5 @@ async def test_update_file_status_normalizes_updates(mock_db_manager):
     assert update_payload["status"] == "processed"
     assert update_payload["fields"] == ["col1"]
     assert update_payload["records_count"] == 1
-    assert update_payload["processed_fs_id"] == processed_id
+    assert update_payload["processed_fs_id"] == PROCESSED_ID
     assert "error_message" not in update_payload
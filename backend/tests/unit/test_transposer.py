@@ -5,22 +5,24 @@ Unit tests for the Vertical CSV Transposer.
 import csv
 from app.services.transposer import parse_vertical_csv
 
+# Every test parses with the default dialect
+EXCEL = csv.get_dialect("excel")
+
+VERTICAL_CSV = (
+    "Key,Value\n"
+    "Name,John Doe\n"
+    "Age,30\n"
+    "City,New York\n"
+    "Key,Value\n"  # Repeater indicates new record
+    "Name,Jane Smith\n"
+    "Age,25\n"
+    "City,London"
+)
+
 
 def test_transposer_valid_vertical_data():
     """Test standard Key-Value transposition."""
-    content = (
-        "Key,Value\n"
-        "Name,John Doe\n"
-        "Age,30\n"
-        "City,New York\n"
-        "Key,Value\n"  # Repeater indicates new record
-        "Name,Jane Smith\n"
-        "Age,25\n"
-        "City,London"
-    )
-    dialect = csv.get_dialect("excel")
-
-    records, fields = parse_vertical_csv(content, dialect)
+    records, fields = parse_vertical_csv(VERTICAL_CSV, EXCEL)
 
     assert len(records) == 2
     assert records[0]["Name"] == "John Doe"
@@ -35,8 +37,7 @@ def test_transposer_valid_vertical_data():
 def test_transposer_single_record():
     """Test a single vertical record without repeating header."""
     content = "Name,John\nAge,30"
-    dialect = csv.get_dialect("excel")
-    records, fields = parse_vertical_csv(content, dialect)
+    records, fields = parse_vertical_csv(content, EXCEL)
 
     assert len(records) == 1
     assert records[0]["Name"] == "John"
@@ -52,8 +53,7 @@ def test_transposer_malformed_lines():
         "Age\n"  # Missing value (should be empty string)
         "City,   \n"  # Empty value with whitespace
     )
-    dialect = csv.get_dialect("excel")
-    records, _ = parse_vertical_csv(content, dialect)
+    records, _ = parse_vertical_csv(content, EXCEL)
 
     assert records[0]["Name"] == "John"
     assert records[0]["Age"] == ""
@@ -63,9 +63,7 @@ def test_transposer_malformed_lines():
 def test_transposer_sanitizes_values():
     """Test that transposed values are sanitized to prevent CSV injection."""
     content = "Name,=1+1\nAge,25"
-    dialect = csv.get_dialect("excel")
-
-    records, _ = parse_vertical_csv(content, dialect)
+    records, _ = parse_vertical_csv(content, EXCEL)
 
     assert records[0]["Name"] == "'=1+1"
 
@@ -75,6 +73,23 @@ def test_transposer_error_handling():
     # Passing an invalid type to force an internal CSV error isn't easy with StringIO,
     # but we can rely on the fact that the function handles exceptions gracefully.
     # Here we test an empty string behavior.
-    records, fields = parse_vertical_csv("", csv.get_dialect("excel"))
+    records, fields = parse_vertical_csv("", EXCEL)
     assert records == []
     assert fields == []
+
+
+def test_transposer_schema_drift_keeps_records_sparse():
+    """Test that fields discovered later are absent from earlier records."""
+    content = "Name,John\nName,Jane\nAge,25"
+    records, fields = parse_vertical_csv(content, EXCEL)
+
+    assert fields == ["Name", "Age"]
+    assert records == [{"Name": "John"}, {"Name": "Jane", "Age": "25"}]
+
+
+def test_transposer_repeated_key_keeps_last_sanitized_value():
+    """Test that overwritten values are dropped and the survivor is sanitized."""
+    content = "Name,John\nAge,=1\nAge,+2"
+    records, _ = parse_vertical_csv(content, EXCEL)
+
+    assert records == [{"Name": "John", "Age": "'+2"}]
@@ -8,54 +8,42 @@ from fastapi import HTTPException, UploadFile
 from app.utils.validators import validate_csv_file
 
 
-def test_validate_valid_csv():
-    """Test that a valid CSV passes validation."""
-    # The 'content_type' property is derived automatically from these headers
-    file = UploadFile(
-        file=BytesIO(b"data"), filename="data.csv", headers={"content-type": "text/csv"}
+def _upload(filename, content_type):
+    """Builds an UploadFile; 'content_type' is derived from the headers."""
+    return UploadFile(
+        file=BytesIO(b"data"), filename=filename, headers={"content-type": content_type}
     )
 
-    # Should not raise exception
-    validate_csv_file(file)
-
-
-def test_validate_csv_with_charset():
-    """Test that CSV content type with charset parameter is accepted."""
-    file = UploadFile(
-        file=BytesIO(b"data"),
-        filename="data.csv",
-        headers={"content-type": "text/csv; charset=utf-8"},
-    )
 
+@pytest.mark.parametrize(
+    "filename, content_type",
+    [
+        ("data.csv", "text/csv"),
+        # Content type with a charset parameter is accepted
+        ("data.csv", "text/csv; charset=utf-8"),
+    ],
+    ids=["plain", "with-charset"],
+)
+def test_validate_valid_csv(filename, content_type):
+    """Test that a valid CSV passes validation."""
     # Should not raise exception
-    validate_csv_file(file)
-
-
-def test_validate_invalid_extension():
-    """Test that non-csv extension raises error."""
-    file = UploadFile(
-        file=BytesIO(b"img"),
-        filename="image.png",
-        headers={"content-type": "image/png"},
-    )
-
-    with pytest.raises(HTTPException) as exc:
-        validate_csv_file(file)
-
-    assert exc.value.status_code == 400
-    assert "Invalid file type" in exc.value.detail
-
-
-def test_validate_invalid_content_type():
-    """Test that valid extension but wrong content type raises error."""
-    file = UploadFile(
-        file=BytesIO(b"fake"),
-        filename="fake.csv",
-        headers={"content-type": "image/png"},
-    )
-
+    validate_csv_file(_upload(filename, content_type))
+
+
+@pytest.mark.parametrize(
+    "filename, content_type, detail",
+    [
+        # Non-csv extension
+        ("image.png", "image/png", "Invalid file type"),
+        # Valid extension but wrong content type
+        ("fake.csv", "image/png", "Invalid CSV content type"),
+    ],
+    ids=["invalid-extension", "invalid-content-type"],
+)
+def test_validate_invalid_file(filename, content_type, detail):
+    """Test that a bad extension or content type raises a 400."""
     with pytest.raises(HTTPException) as exc:
-        validate_csv_file(file)
+        validate_csv_file(_upload(filename, content_type))
 
     assert exc.value.status_code == 400
-    assert "Invalid CSV content type" in exc.value.detail
+    assert detail in exc.value.detail